@@ -1,13 +1,122 @@
 import sqlite3
+import os
+import copy
+import weakref
+import collections
+import queue
+import threading
+import contextlib
 from logging import getLogger, Handler, LogRecord
+from logging.handlers import QueueHandler, QueueListener
 import time
 import datetime as dt
 import traceback
-import re
 from typing import Callable, Union
 
 __all__ = ['SQLite3Handler', 'TimedRotatingSQLite3Handler']
 
+# handlers whose connections must not be used in a forked child
+_handlers = weakref.WeakSet()
+# connections inherited by a forked child; they are kept referenced so that
+# they are never closed, since SQLite connections must not cross fork()
+_inherited_connections = []
+
+
+def _after_fork_in_child():
+    for handler in list(_handlers):
+        handler._drop_connections()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _create_sql(table_name: str, columns: tuple) -> str:
+    "build CREATE TABLE statement for table_name with columns"
+    return f"""
+        CREATE TABLE IF NOT EXISTS
+        {table_name}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {','.join(f'{col.name} {col.type}' for col in columns)}
+        );
+    """
+
+
+def _create_index_sql(table_name: str, column_names: tuple) -> tuple:
+    "build CREATE INDEX statements for column_names of table_name"
+    return tuple(f"""
+        CREATE INDEX IF NOT EXISTS
+        ix_{table_name}_{name.lower()} ON {table_name}({name});
+    """ for name in column_names)
+
+
+def _insert_parts(columns: tuple) -> tuple:
+    "build column names and placeholders of INSERT statement for columns"
+    return (','.join(col.name for col in columns),
+            ', '.join(['?'] * len(columns)))
+
+
+def _insert_sql(table_name: str, col_names: str, placeholders: str) -> str:
+    "build INSERT statement for table_name"
+    return f"""
+        INSERT INTO {table_name}({col_names})
+        VALUES({placeholders});
+    """
+
+
+# names available to LogCol expressions, besides `record` and its `exc_info`
+_EXPR_NAMESPACE = {'dt': dt, 'time': time, 'traceback': traceback,
+                   'format_exception': traceback.format_exception}
+
+
+def _value_function(expr: str,
+                    exc_only: bool = False) -> Callable[[LogRecord], object]:
+    "compile a LogCol expression into a function taking logging.LogRecord"
+    source = (
+        "def _get_value(record):\n"
+        "    exc_info = record.exc_info\n"
+        + ("    if not exc_info:\n"
+           "        return None\n" if exc_only else "")
+        + f"    return ({expr})\n"
+    )
+    namespace = dict(_EXPR_NAMESPACE)
+    exec(compile(source, '<SQLite3Handler.LogCol>', 'exec'), namespace)
+    return namespace['_get_value']
+
+
+def _row_function(columns: tuple) -> Callable[[LogRecord], tuple]:
+    """
+    generate a function which returns the values of all columns for a record
+    ---
+    Parameters:
+        columns: tuple of SQLite3Handler.LogCol
+    ---
+    Returns:
+        function taking logging.LogRecord, where the expressions of the
+        columns are inlined and other columns call their get_value_func.
+        exc_only columns share one exc_info check and are None without it.
+    """
+    namespace = dict(_EXPR_NAMESPACE)
+    values = []
+    exc_values = []
+    for i, col in enumerate(columns):
+        if col.expr is None:
+            namespace[f'_get_value_{i}'] = col.get_value_func
+            value = f'_get_value_{i}(record)'
+        else:
+            value = f'({col.expr})'
+        exc_values.append(value)
+        values.append('None' if col.exc_only else value)
+    source = (
+        "def _row(record):\n"
+        "    exc_info = record.exc_info\n"
+        "    if not exc_info:\n"
+        f"        return ({', '.join(values)},)\n"
+        f"    return ({', '.join(exc_values)},)\n"
+    )
+    exec(compile(source, '<SQLite3Handler._row>', 'exec'), namespace)
+    return namespace['_row']
+
 
 class SQLite3Handler(Handler):
     "Logging Handler which inserts logs into sqlite3 database"
@@ -16,10 +125,28 @@ class SQLite3Handler(Handler):
         "represents 1 column of table"
 
         def __init__(self, name: str,
-                     get_value_func: Callable[[LogRecord], Union[int, float, str, dt.datetime]],
-                     col_type: str = 'TEXT'):
+                     get_value_func: Union[str, Callable[[LogRecord], Union[int, float, str, dt.datetime]]],
+                     col_type: str = 'TEXT', exc_only: bool = False):
+            """
+            Parameters:
+                name: column name
+                get_value_func: function taking logging.LogRecord, or
+                    expression of `record` (and `exc_info`, which is
+                    record.exc_info) which is inlined into the
+                    row-building function of the handler
+                col_type: column type
+                exc_only: if True, the value is None for records without
+                    exc_info; a function is called only with it, while
+                    one compiled from an expression returns None itself
+            """
             self.name = name
             self.type = col_type
+            self.exc_only = exc_only
+            if isinstance(get_value_func, str):
+                self.expr = get_value_func
+                get_value_func = _value_function(self.expr, exc_only)
+            else:
+                self.expr = None
             self.get_value_func = get_value_func
 
         def get_value(self, record: LogRecord) -> Union[int, float, str, dt.datetime]:
@@ -32,85 +159,449 @@ class SQLite3Handler(Handler):
             Returns:
                 data to be inserted into SQLite3 database
             """
+            if self.exc_only and not record.exc_info:
+                return None
             return self.get_value_func(record)
 
     TABLE_NAME = 'logs'
 
     TABLE_COLUMNS = (
-        LogCol('Time', lambda x: dt.datetime(
-            *time.localtime(x.created)[:6], int(x.msecs * 1000))),
-        LogCol('LoggerName', lambda x: x.name),
-        LogCol('Level', lambda x: x.levelname),
-        LogCol('FileName', lambda x: x.pathname),
-        LogCol('LineNo', lambda x: x.lineno, 'INTEGER'),
-        LogCol('ModuleName', lambda x: x.module),
-        LogCol('FuncName', lambda x: x.funcName),
-        LogCol('ProcessID', lambda x: x.process, 'INTEGER'),
-        LogCol('ProcessName', lambda x: x.processName),
-        LogCol('ThreadID', lambda x: x.thread, 'INTEGER'),
-        LogCol('ThreadName', lambda x: x.threadName),
-        LogCol('LogMessage', lambda x: x.getMessage()),
-        LogCol('ExceptionType',
-               lambda x: x.exc_info[0].__name__ if x.exc_info else None),
-        LogCol('TraceBack', lambda x: ''.join(
-            traceback.format_exception(*x.exc_info)) if x.exc_info else None)
+        # same text as sqlite3's default datetime adapter, which is
+        # deprecated since Python 3.12
+        LogCol('Time', "dt.datetime.fromtimestamp(record.created)"
+                       ".isoformat(' ')"),
+        LogCol('LoggerName', 'record.name'),
+        LogCol('Level', 'record.levelname'),
+        LogCol('FileName', 'record.pathname'),
+        LogCol('LineNo', 'record.lineno', 'INTEGER'),
+        LogCol('ModuleName', 'record.module'),
+        LogCol('FuncName', 'record.funcName'),
+        LogCol('ProcessID', 'record.process', 'INTEGER'),
+        LogCol('ProcessName', 'record.processName'),
+        LogCol('ThreadID', 'record.thread', 'INTEGER'),
+        LogCol('ThreadName', 'record.threadName'),
+        LogCol('LogMessage', 'record.getMessage()'),
+        LogCol('ExceptionType', 'exc_info[0].__name__', exc_only=True),
+        LogCol('TraceBack', "''.join(format_exception(*exc_info))",
+               exc_only=True)
     )
 
-    def __init__(self, database: str, level: str = 'INFO'):
+    # names of columns to be indexed for queries
+    INDEXED_COLUMNS = ('Time', 'Level', 'LoggerName')
+
+    CREATE_SQL = _create_sql(TABLE_NAME, TABLE_COLUMNS)
+    CREATE_INDEX_SQL = _create_index_sql(TABLE_NAME, INDEXED_COLUMNS)
+    INSERT_COL_NAMES, INSERT_PLACEHOLDERS = _insert_parts(TABLE_COLUMNS)
+    INSERT_SQL = _insert_sql(TABLE_NAME, INSERT_COL_NAMES, INSERT_PLACEHOLDERS)
+    _row = staticmethod(_row_function(TABLE_COLUMNS))
+    # names of the above attributes built from TABLE_* / INDEXED_COLUMNS
+    _generated = frozenset((
+        'CREATE_SQL', 'CREATE_INDEX_SQL', 'INSERT_COL_NAMES',
+        'INSERT_PLACEHOLDERS', 'INSERT_SQL', '_row'))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # follow TABLE_NAME / TABLE_COLUMNS / INDEXED_COLUMNS inherited or
+        # overridden by subclasses, unless the subclass sets the value itself
+        builders = (
+            ('CREATE_SQL',
+             lambda: _create_sql(cls.TABLE_NAME, cls.TABLE_COLUMNS)),
+            ('CREATE_INDEX_SQL',
+             lambda: _create_index_sql(cls.TABLE_NAME, cls.INDEXED_COLUMNS)),
+            ('INSERT_COL_NAMES', lambda: _insert_parts(cls.TABLE_COLUMNS)[0]),
+            ('INSERT_PLACEHOLDERS',
+             lambda: _insert_parts(cls.TABLE_COLUMNS)[1]),
+            ('INSERT_SQL',
+             lambda: _insert_sql(cls.TABLE_NAME, cls.INSERT_COL_NAMES,
+                                 cls.INSERT_PLACEHOLDERS)),
+            ('_row',
+             lambda: staticmethod(_row_function(cls.TABLE_COLUMNS))),
+        )
+        generated = set()
+        for name, build in builders:
+            # the nearest class defining name set it explicitly
+            # unless it is listed in that class's _generated
+            owner = next(klass for klass in cls.__mro__
+                         if name in klass.__dict__)
+            if owner is not cls and name in owner.__dict__['_generated']:
+                setattr(cls, name, build())
+                generated.add(name)
+        cls._generated = frozenset(generated)
+
+    def __init__(self, database: str, level: str = 'INFO',
+                 flush_every: int = 0, flush_interval: float = 1.0,
+                 mmap_size: int = 134217728, cache_size: int = -16000):
+        """
+        Parameters:
+            database: path of SQLite3 database
+            level: logging level
+            flush_every: if positive, logs are buffered in memory and
+                inserted when this many are buffered, every flush_interval
+                seconds, and on flush()/close(). Buffered logs are lost
+                if the process crashes.
+            flush_interval: seconds between periodic flushes of the buffer
+            mmap_size: PRAGMA mmap_size, bytes of database memory-mapped
+            cache_size: PRAGMA cache_size, pages if positive,
+                KiB if negative
+        """
         self.database = database
-        connection = sqlite3.connect(self.database)
-        self.create_table(connection)
-        connection.close()
+        self.mmap_size = int(mmap_size)
+        self.cache_size = int(cache_size)
+        self._wal_databases = set()
+        self._cursors = {}
+        # each thread inserts through its own connection
+        self._local = threading.local()
+        self._thread_connections = {}
+        self._thread_connections_lock = threading.Lock()
+        # close() waits for connections in use, guarded by the lock above
+        self._thread_connections_cond = threading.Condition(
+            self._thread_connections_lock)
+        self._active = 0
+        self._closed = False
+        _handlers.add(self)
+        self.create_table(self._get_conn())
 
         super().__init__(level)
+        self._start_flushing(flush_every, flush_interval)
+
+    @classmethod
+    def build_async(cls, database: str, level: str = 'INFO',
+                    queue_size: int = 10000, **kwargs) -> QueueHandler:
+        """
+        build a handler which inserts logs on a background thread
+        ---
+        Parameters:
+            database: path of SQLite3 database
+            level: logging level
+            queue_size: max number of records waiting to be inserted
+            kwargs: passed to the constructor of this class
+        ---
+        Returns:
+            logging.handlers.QueueHandler to be added to a Logger.
+            Its `listener` attribute is the running QueueListener.
+            Closing the handler (logging.shutdown() does it at exit) stops
+            the listener after the queued records have been inserted,
+            then closes the database.
+        """
+        log_queue = queue.Queue(queue_size)
+        sink = cls(database, level=level, **kwargs)
+        listener = _BatchQueueListener(
+            log_queue, sink, respect_handler_level=True)
+        handler = _AsyncSQLite3Handler(log_queue, listener)
+        handler.setLevel(level)
+        listener.start()
+        return handler
 
     def emit(self, record: LogRecord):
         "this method is called when Logging-Event is triggered"
-        connection = sqlite3.connect(self.database)
+        if self.flush_every:
+            self._buffer_record(record)
+            return
         try:
-            self.insert_log(connection, record)
+            with self._use_conn() as connection:
+                self.insert_log(connection, record)
         except Exception:
             self.handleError(record)
+
+    def handle(self, record: LogRecord):
+        "emit record if it passes the filters"
+        # unless logs are buffered, self.lock is not held: each thread has
+        # its own connection and SQLite serializes their writes
+        if self.flush_every:
+            return super().handle(record)
+        rv = self.filter(record)
+        if isinstance(rv, LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
+    def handle_many(self, records: list):
+        """
+        emit filtered records in one transaction
+        ---
+        Parameters:
+            records: list of logging.LogRecord
+        """
+        filtered = []
+        for record in records:
+            # filters may return a replacement LogRecord, as in handle()
+            rv = self.filter(record)
+            if rv:
+                filtered.append(rv if isinstance(rv, LogRecord) else record)
+        records = filtered
+        if records:
+            with self.lock:
+                self.emit_many(records)
+
+    def emit_many(self, records: list):
+        "insert multiple logs at once"
+        try:
+            with self._use_conn() as connection:
+                self.insert_logs(connection, records)
+        except Exception:
+            for record in records:
+                self.handleError(record)
+
+    def flush(self):
+        "insert buffered logs"
+        with self.lock:
+            if self._buffer:
+                records, self._buffer = self._buffer, []
+                self.emit_many(records)
+
+    def close(self):
+        "flush buffered logs and close the database connections"
+        self._stop_flushing()
+        with self.lock, self._thread_connections_cond:
+            self._closed = True
+            # do not close connections in the middle of inserting
+            self._thread_connections_cond.wait_for(lambda: not self._active)
+            for connection in self._thread_connections.values():
+                connection.close()
+            self._thread_connections.clear()
+            self._cursors.clear()
+        super().close()
+
+    @contextlib.contextmanager
+    def _use_conn(self):
+        "use the connection of the current thread, which close() waits for"
+        with self._thread_connections_cond:
+            if self._closed:
+                raise ValueError('handler is closed')
+            self._active += 1
+        try:
+            yield self._get_conn()
         finally:
-            connection.close()
+            with self._thread_connections_cond:
+                self._active -= 1
+                if not self._active:
+                    self._thread_connections_cond.notify_all()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        "get the connection of the current thread"
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._connect(self.database)
+            with self._thread_connections_lock:
+                if self._closed:
+                    connection.close()
+                    raise ValueError('handler is closed')
+                # connections of finished threads will not be used anymore
+                for thread in [thread for thread in self._thread_connections
+                               if not thread.is_alive()]:
+                    finished = self._thread_connections.pop(thread)
+                    self._cursors.pop(finished, None)
+                    finished.close()
+                self._thread_connections[threading.current_thread()] = \
+                    connection
+            self._local.connection = connection
+        return connection
+
+    def _drop_connections(self):
+        "forget connections inherited from the parent process"
+        _inherited_connections.extend(self._thread_connections.values())
+        self._local = threading.local()
+        self._thread_connections = {}
+        self._cursors = {}
+        # another thread of the parent may have held the lock at fork()
+        self._thread_connections_lock = threading.Lock()
+        self._thread_connections_cond = threading.Condition(
+            self._thread_connections_lock)
+        self._active = 0
+
+    def _start_flushing(self, flush_every: int, flush_interval: float):
+        "set up the buffer and the thread flushing it periodically"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._closing = threading.Event()
+        self._flush_thread = None
+        if flush_every:
+            self._flush_thread = threading.Thread(
+                target=self._flush_periodically, daemon=True)
+            self._flush_thread.start()
+
+    def _flush_periodically(self):
+        while not self._closing.wait(self.flush_interval):
+            with self.lock:
+                # close() flushes the rest itself after setting _closing
+                if self._closing.is_set():
+                    return
+                self.flush()
+
+    def _stop_flushing(self):
+        "stop the flushing thread and flush the rest of the buffer"
+        # the thread is not joined: close() may be called with self.lock
+        # held (e.g. by logging.shutdown), which the thread may be waiting
+        # for; it returns without flushing once it gets the lock
+        self._closing.set()
+        self._flush_thread = None
+        self.flush()
+
+    def _buffer_record(self, record: LogRecord):
+        "buffer record and flush when flush_every records are buffered"
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def _connect(self, database: str) -> sqlite3.Connection:
+        "open a connection which is reused across logging events"
+        # timeout sets busy_timeout, waiting for writers on other connections
+        connection = sqlite3.connect(
+            database, timeout=5.0, check_same_thread=False,
+            isolation_level=None, cached_statements=128)
+        self._configure(connection, database)
+        self._cursors[connection] = connection.cursor()
+        return connection
+
+    def _configure(self, connection: sqlite3.Connection, database: str):
+        "apply PRAGMAs to a newly opened connection"
+        # journal_mode is persistent in the database file, so set it only once
+        if database not in self._wal_databases:
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._wal_databases.add(database)
+        # the others are connection-local and must be set on every connection
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        connection.execute(f'PRAGMA cache_size={self.cache_size}')
+        connection.execute(f'PRAGMA mmap_size={self.mmap_size}')
 
     def insert_log(self, connection: sqlite3.Connection, record: LogRecord):
-        "insert log into TABLE_NAME table"
-        names = []
-        values = []
-        for col in self.TABLE_COLUMNS:
-            names.append(col.name)
-            values.append(col.get_value(record))
-        cursor = connection.cursor()
-        cursor.execute(f"""
-            INSERT INTO {self.TABLE_NAME}({','.join(names)})
-            VALUES({', '.join(['?'] * len(values))});
-        """, values)
-        connection.commit()
+        "insert log into TABLE_NAME table of autocommit connection"
+        # Connection.execute allocates a new cursor on every call,
+        # so use the one cached for connections opened by this handler
+        cursor = self._cursors.get(connection) or connection
+        cursor.execute(self.INSERT_SQL, self._row(record))
+
+    def insert_logs(self, connection: sqlite3.Connection, records: list):
+        "insert logs into TABLE_NAME table in one transaction"
+        rows = [self._row(record) for record in records]
+        connection.execute('BEGIN')
+        try:
+            connection.executemany(self.INSERT_SQL, rows)
+            connection.execute('COMMIT')
+        except Exception:
+            # also when COMMIT fails, so that later BEGINs do not fail
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
 
     def create_table(self, connection: sqlite3.Connection):
-        "create TABLE_NAME table if it does not exist"
-        cursor = connection.cursor()
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS 
-            {self.TABLE_NAME}(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                {','.join(map(lambda x: f'{x.name} {x.type}', self.TABLE_COLUMNS))}
-            );
-        """)
-        connection.commit()
+        "create TABLE_NAME table and its indexes if they do not exist"
+        connection.execute(self.CREATE_SQL)
+        for sql in self.CREATE_INDEX_SQL:
+            connection.execute(sql)
+
+
+class _BatchQueueListener(QueueListener):
+    """
+    QueueListener which passes queued records to handlers in batches
+    of up to BATCH_SIZE records or BATCH_INTERVAL seconds
+    """
+
+    BATCH_SIZE = 256
+    BATCH_INTERVAL = 0.05
+
+    def enqueue_sentinel(self):
+        # wait for room in the bounded queue, so that stop() does not raise
+        # queue.Full when it is closed during a burst, but only while the
+        # thread is alive to make room; a dead thread needs no sentinel
+        while self._thread is not None and self._thread.is_alive():
+            try:
+                self.queue.put(self._sentinel, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, 'task_done')
+        stopped = False
+        while not stopped:
+            record = self.dequeue(True)
+            if record is self._sentinel:
+                stopped = True
+                batch = []
+            else:
+                batch = [record]
+            deadline = time.monotonic() + self.BATCH_INTERVAL
+            while not stopped and len(batch) < self.BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stopped = True
+                else:
+                    batch.append(record)
+            if batch:
+                self.handle_many(batch)
+            if has_task_done:
+                for _ in range(len(batch) + stopped):
+                    q.task_done()
+
+    def handle_many(self, records: list):
+        "pass records to each handler's handle_many"
+        records = [self.prepare(record) for record in records]
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                batch = [record for record in records
+                         if record.levelno >= handler.level]
+            else:
+                batch = records
+            if batch:
+                handler.handle_many(batch)
+
+
+class _AsyncSQLite3Handler(QueueHandler):
+    "QueueHandler which owns the QueueListener feeding SQLite3Handler"
+
+    def __init__(self, log_queue: queue.Queue, listener: QueueListener):
+        super().__init__(log_queue)
+        self.listener = listener
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        # unlike QueueHandler.prepare, keep exc_info for the exception
+        # columns, so that the traceback is formatted on the listener thread;
+        # records never leave the process so it is safe to pass
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def close(self):
+        "stop the listener after draining the queue and close the sink"
+        with self.lock:
+            if self.listener._thread is not None:
+                self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+        super().close()
 
 
 class TimedRotatingSQLite3Handler(SQLite3Handler):
     "Logging Handler which inserts logs into sqlite3 database"
 
-    def __init__(self, database: str, interval: str, level: str = 'INFO'):
+    # number of rotated databases kept open
+    MAX_CONNECTIONS = 2
+
+    # pooled connections are shared by all threads, so emit holds self.lock
+    handle = Handler.handle
+
+    def __init__(self, database: str, interval: str, level: str = 'INFO',
+                 flush_every: int = 0, flush_interval: float = 1.0,
+                 mmap_size: int = 134217728, cache_size: int = -16000):
         self.interval = interval
-        dbext_re = '(\.db$|\.sqlite$|\.sqlite3$)'
-        dbname = re.sub(dbext_re, '', database)
-        dbext = re.search(dbext_re, database)
-        dbext = dbext.string[dbext.start(): dbext.end()
-                             ] if dbext else '.sqlite3'
+        for dbext in ('.db', '.sqlite3', '.sqlite'):
+            if database.endswith(dbext):
+                dbname = database[:-len(dbext)]
+                break
+        else:
+            dbname, dbext = database, '.sqlite3'
         if interval == 'year':
             timeformat = '_%Y'
         elif interval == 'month':
@@ -124,18 +615,133 @@ class TimedRotatingSQLite3Handler(SQLite3Handler):
         else:
             timeformat = ''
         self.dbformat = dbname + timeformat + dbext
+        self.mmap_size = int(mmap_size)
+        self.cache_size = int(cache_size)
+        self._wal_databases = set()
+        self._cursors = {}
+        self._connections = collections.OrderedDict()
+        self._known_dbs = set()
+        self._closed = False
+        _handlers.add(self)
+        # [start, end) timestamps of the interval self._dbname belongs to
+        self._interval_start = self._interval_end = 0.0
+        self._dbname = None
 
         # Handler.__init__(self, level)
         super(SQLite3Handler, self).__init__(level)
+        self._start_flushing(flush_every, flush_interval)
 
     def emit(self, record: LogRecord):
-        date = dt.datetime(*time.localtime(record.created)[:6])
-        database = date.strftime(self.dbformat)
-        connection = sqlite3.connect(database)
+        if self.flush_every:
+            self._buffer_record(record)
+            return
+        database = self._get_dbname(record)
         try:
-            self.create_table(connection)
+            connection = self._get_connection(database)
             self.insert_log(connection, record)
         except Exception as e:
             self.handleError(record)
-        finally:
+
+    def emit_many(self, records: list):
+        "insert multiple logs at once, grouped by rotated database"
+        groups = {}
+        for record in records:
+            groups.setdefault(self._get_dbname(record), []).append(record)
+        for database, group in groups.items():
+            try:
+                connection = self._get_connection(database)
+                self.insert_logs(connection, group)
+            except Exception:
+                for record in group:
+                    self.handleError(record)
+
+    def close(self):
+        "flush buffered logs and close the database connections"
+        self._stop_flushing()
+        with self.lock:
+            self._closed = True
+            self._close_connections()
+        super(SQLite3Handler, self).close()
+
+    def _get_dbname(self, record: LogRecord) -> str:
+        "get rotated database name for record"
+        if not self._interval_start <= record.created < self._interval_end:
+            date = dt.datetime.fromtimestamp(record.created)
+            start, end = self._get_interval(date)
+            self._interval_start = start
+            self._interval_end = end
+            self._dbname = date.strftime(self.dbformat)
+        return self._dbname
+
+    def _get_interval(self, date: dt.datetime) -> tuple:
+        "get [start, end) timestamps of the interval which date belongs to"
+        if self.interval == 'year':
+            start = date.replace(month=1, day=1, hour=0, minute=0,
+                                 second=0, microsecond=0)
+            end = start.replace(year=start.year + 1)
+        elif self.interval == 'month':
+            start = date.replace(day=1, hour=0, minute=0,
+                                 second=0, microsecond=0)
+            end = start.replace(year=start.year + start.month // 12,
+                                month=start.month % 12 + 1)
+        elif self.interval == 'day':
+            start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+            end = start + dt.timedelta(days=1)
+        elif self.interval == 'hour':
+            # add real seconds, since wall-clock arithmetic breaks when
+            # clocks fall back; fold from fromtimestamp keeps start right.
+            # the next local hour may come earlier after a 30-minute gap
+            start = date.replace(minute=0, second=0, microsecond=0)
+            return start.timestamp(), min(
+                start.timestamp() + 3600,
+                (start + dt.timedelta(hours=1)).timestamp())
+        elif self.interval == 'minute':
+            start = date.replace(second=0, microsecond=0)
+            return start.timestamp(), start.timestamp() + 60
+        else:
+            return float('-inf'), float('inf')
+        return start.timestamp(), end.timestamp()
+
+    def _get_connection(self, database: str) -> sqlite3.Connection:
+        "get connection from the LRU pool of rotated databases"
+        if self._closed:
+            raise ValueError('handler is closed')
+        connection = self._connections.get(database)
+        if connection is not None:
+            self._connections.move_to_end(database)
+            return connection
+        connection = self._connect(database)
+        if database not in self._known_dbs:
+            # the table is created once per database, not every time
+            # an evicted connection is reopened
+            try:
+                self.create_table(connection)
+            except Exception:
+                self._cursors.pop(connection, None)
+                connection.close()
+                raise
+            self._known_dbs.add(database)
+        self._connections[database] = connection
+        while len(self._connections) > self.MAX_CONNECTIONS:
+            # keep the previous database open for records arriving late
+            oldest_database, oldest = self._connections.popitem(last=False)
+            self._cursors.pop(oldest, None)
+            oldest.close()
+            # remember only pooled databases, so that the sets do not grow
+            # forever; a late record for an older one just repeats the
+            # idempotent PRAGMA journal_mode and CREATE ... IF NOT EXISTS
+            self._known_dbs.discard(oldest_database)
+            self._wal_databases.discard(oldest_database)
+        return connection
+
+    def _drop_connections(self):
+        "forget connections inherited from the parent process"
+        _inherited_connections.extend(self._connections.values())
+        self._connections = collections.OrderedDict()
+        self._cursors = {}
+
+    def _close_connections(self):
+        for connection in self._connections.values():
             connection.close()
+        self._connections.clear()
+        self._cursors.clear()
@@ -0,0 +1,84 @@
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import weakref
+
+from SQLite3Handler import SQLite3Handler, TimedRotatingSQLite3Handler
+
+
+class BufferedShutdownTest(unittest.TestCase):
+    "logging.shutdown() while the flushing thread is running"
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_shutdown_with_active_flusher(self):
+        database = os.path.join(self.dir, 'log.sqlite3')
+        for _ in range(50):
+            handler = SQLite3Handler(database, flush_every=1000,
+                                     flush_interval=0.0005)
+            record = logging.LogRecord(
+                'test', logging.INFO, __file__, 1, 'message', None, None)
+            handler.handle(record)
+            shutdown = threading.Thread(
+                target=logging.shutdown,
+                kwargs={'handlerList': [weakref.ref(handler)]},
+                daemon=True)
+            shutdown.start()
+            shutdown.join(5)
+            self.assertFalse(shutdown.is_alive(), 'logging.shutdown hung')
+
+        connection = sqlite3.connect(database)
+        self.addCleanup(connection.close)
+        count, = connection.execute('SELECT COUNT(*) FROM logs').fetchone()
+        self.assertEqual(count, 50)
+
+
+@unittest.skipUnless(hasattr(time, 'tzset'), 'requires time.tzset')
+class RotationDSTTest(unittest.TestCase):
+    "rotated database names around daylight saving time transitions"
+
+    # (time zone, UTC timestamp of a transition)
+    TRANSITIONS = (
+        ('America/New_York', 1772953200),  # 2026-03-08 spring forward 1h
+        ('America/New_York', 1793512800),  # 2026-11-01 fall back 1h
+        ('Australia/Lord_Howe', 1775314800),  # 2026-04-05 fall back 30m
+        ('Australia/Lord_Howe', 1791041400),  # 2026-10-04 spring forward 30m
+    )
+
+    def setUp(self):
+        tz = os.environ.get('TZ')
+        self.addCleanup(time.tzset)
+        if tz is None:
+            self.addCleanup(os.environ.pop, 'TZ', None)
+        else:
+            self.addCleanup(os.environ.__setitem__, 'TZ', tz)
+
+    def test_names_match_localtime(self):
+        for tz, transition in self.TRANSITIONS:
+            os.environ['TZ'] = tz
+            time.tzset()
+            for interval in ('minute', 'hour', 'day'):
+                handler = TimedRotatingSQLite3Handler('log.db', interval)
+                with self.subTest(tz=tz, transition=transition,
+                                  interval=interval):
+                    for created in range(transition - 3 * 3600,
+                                         transition + 3 * 3600, 61):
+                        record = logging.LogRecord(
+                            'test', logging.INFO, __file__, 1, 'message',
+                            None, None)
+                        record.created = created + 0.5
+                        self.assertEqual(
+                            handler._get_dbname(record),
+                            time.strftime(handler.dbformat,
+                                          time.localtime(record.created)))
+
+
+if __name__ == '__main__':
+    unittest.main()